@@ -1,5 +1,5 @@
 import click
-from converter.registry import Registry
+from converter.registry import get_registry
 import os
 import sys
 
@@ -23,7 +23,7 @@ def convert(input_file, output_file):
                 print("Operation cancelled.")
                 return
 
-        registry = Registry()
+        registry = get_registry()
         module = registry.find_module(input_file, output_file)
         if not module:
             error(f"No module found to handle {input_file} -> {output_file}")
@@ -1,10 +1,53 @@
+import ast
 import os
 import importlib
+from functools import lru_cache
+
+
+def extension(filename):
+    """Return the lowercased extension of filename including the dot, or '' if it has none."""
+    # Like os.path.splitext, leading dots of the base name never begin an extension
+    start = filename.rfind('/') + 1
+    while start < len(filename) and filename[start] == '.':
+        start += 1
+    dot = filename.rfind('.')
+    if dot < start:
+        return ''
+    return filename[dot:].lower()
+
+
+def read_supported_formats(path):
+    """Read a module's SUPPORTED_FORMATS literal from source, or return None if it has no literal one."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and \
+                any(isinstance(target, ast.Name) and target.id == "SUPPORTED_FORMATS" for target in node.targets):
+            try:
+                return ast.literal_eval(node.value)
+            except ValueError:
+                return None
+    return None
+
+
+class LazyModule:
+    """Stand-in for a converter module that is only imported when convert() is first called."""
+
+    def __init__(self, name, supported_formats):
+        self.__name__ = name
+        self.SUPPORTED_FORMATS = supported_formats
+        self._module = None
+
+    def convert(self, input_file, output_file):
+        if self._module is None:
+            self._module = importlib.import_module(self.__name__)
+        return self._module.convert(input_file, output_file)
 
 
 class Registry:
     def __init__(self):
         self.modules = []
+        self.dispatch = {}
         self.load_modules()
 
     def load_modules(self):
@@ -13,15 +56,27 @@ class Registry:
         for file in os.listdir(module_path):
             if file.endswith(".py") and file != "__init__.py":
                 module_name = f"converter.modules.{file[:-3]}"
-                module = importlib.import_module(module_name)
+                # Defer importing heavy converter dependencies (ffmpeg, PyMuPDF, reportlab) until first use
+                supported_formats = read_supported_formats(os.path.join(module_path, file))
+                if supported_formats is not None:
+                    module = LazyModule(module_name, supported_formats)
+                else:
+                    module = importlib.import_module(module_name)
                 if hasattr(module, "SUPPORTED_FORMATS"):
                     self.modules.append(module)
+                    self.register_formats(module)
+
+    def register_formats(self, module):
+        # The first module loaded for a pair wins, as with the old linear scan
+        for input_ext in module.SUPPORTED_FORMATS.get("input", []):
+            for output_ext in module.SUPPORTED_FORMATS.get("output", []):
+                self.dispatch.setdefault((input_ext, output_ext), module)
 
     def find_module(self, input_file, output_file):
-        input_ext = os.path.splitext(input_file)[1].lower()
-        output_ext = os.path.splitext(output_file)[1].lower()
-        for module in self.modules:
-            if input_ext in module.SUPPORTED_FORMATS.get("input", []) and \
-                    output_ext in module.SUPPORTED_FORMATS.get("output", []):
-                return module
-        return None
+        return self.dispatch.get((extension(input_file), extension(output_file)))
+
+
+@lru_cache(maxsize=1)
+def get_registry():
+    """Return the process-wide Registry, loading the converter modules on first use."""
+    return Registry()
@@ -6,12 +6,19 @@ Supports HTTPS with SSL certificates
 import uvicorn
 import os
 import sys
-from main import app
 
 def main():
     # Configuration from environment variables
     host = os.getenv('HOST', '0.0.0.0')
     port = int(os.getenv('PORT', 8000))
+    try:
+        # uvicorn treats 0 workers as 1
+        workers = max(1, int(os.getenv('WORKERS', os.cpu_count() or 1)))
+    except ValueError:
+        print(f"Error: WORKERS must be an integer, got {os.getenv('WORKERS')!r}")
+        sys.exit(1)
+    # Each worker process reads its share of the conversion thread pool from this private variable
+    os.environ['_CONVERTER_THREADS'] = str(max(1, (os.cpu_count() or 1) // workers))
     
     # SSL Configuration
     ssl_keyfile = os.getenv('SSL_KEYFILE')
@@ -26,23 +33,25 @@ def main():
             print(f"Error: SSL certificate file not found: {ssl_certfile}")
             sys.exit(1)
         
-        print(f"Starting HTTPS server on {host}:{port}")
+        print(f"Starting HTTPS server on {host}:{port} with {workers} workers")
         uvicorn.run(
-            app, 
+            "main:app",
             host=host, 
             port=port, 
             ssl_keyfile=ssl_keyfile, 
             ssl_certfile=ssl_certfile,
-            reload=False
+            reload=False,
+            workers=workers
         )
     else:
-        print(f"Starting HTTP server on {host}:{port}")
+        print(f"Starting HTTP server on {host}:{port} with {workers} workers")
         print("Warning: Running without HTTPS. For production, set SSL_KEYFILE and SSL_CERTFILE environment variables.")
         uvicorn.run(
-            app, 
+            "main:app",
             host=host, 
             port=port,
-            reload=False
+            reload=False,
+            workers=workers
         )
 
 if __name__ == "__main__":
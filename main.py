@@ -1,32 +1,159 @@
+import concurrent.futures
+import contextlib
+import hmac
 import os
+import re
 import tempfile
 import shutil
-from typing import Dict, List, Any, Annotated
+from typing import Dict, List, Any, Annotated, Optional
 from fastapi import FastAPI, File, UploadFile, HTTPException, Header, Form
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+from starlette.background import BackgroundTask
 import asyncio
-from converter.registry import Registry
+import orjson
+import pybase64
+from converter.registry import extension, get_registry
 from fastmcp import FastMCP
 from fastmcp.server.auth.providers.bearer import BearerAuthProvider, RSAKeyPair
 from mcp.server.auth.provider import AccessToken
 from mcp.types import TextContent, INVALID_PARAMS, INTERNAL_ERROR
 from mcp import ErrorData, McpError
 
-app = FastAPI(title="File Converter API")
+app = FastAPI(title="File Converter API", default_response_class=ORJSONResponse)
 
-# Add CORS middleware
+# Add CORS middleware. Explicit methods/headers let Starlette answer preflights from fixed sets;
+# credentials stay off since clients authenticate with a bearer header, not cookies.
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=[o.strip() for o in os.getenv('CORS_ALLOW_ORIGINS', '*').split(',') if o.strip()],
+    allow_methods=["GET", "POST"],
+    allow_headers=["authorization", "content-type"],
 )
 
 # Initialize registry
-registry = Registry()
+registry = get_registry()
+
+
+def _render_formats_markdown(formats_info: Dict[str, Dict[str, List[str]]]) -> str:
+    """Render the supported formats as the markdown shown by list_supported_formats."""
+    result = "📋 **Supported File Conversion Formats:**\n\n"
+    for module_name, formats in formats_info.items():
+        result += f"**{module_name.replace('_', ' ').title()}:**\n"
+        result += f"- Input: {', '.join(formats.get('input', []))}\n"
+        result += f"- Output: {', '.join(formats.get('output', []))}\n\n"
+    return result
+
+
+# Supported formats never change after the registry loads, so render them once
+FORMATS_INFO = {module.__name__.split('.')[-1]: module.SUPPORTED_FORMATS for module in registry.modules}
+FORMATS_JSON_BYTES = orjson.dumps(FORMATS_INFO)
+FORMATS_MARKDOWN = _render_formats_markdown(FORMATS_INFO)
+
+# Converters are blocking (ffmpeg, Pillow, PyMuPDF); run them here so the event loop stays responsive.
+# deploy.py sets _CONVERTER_THREADS to each worker's share of the CPUs; a single process uses them all.
+EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=max(1, int(os.getenv('_CONVERTER_THREADS') or os.cpu_count() or 1))
+)
+
+# The MCP tool's scratch files are short-lived; keep them in memory-backed /dev/shm when available.
+# Override with SCRATCH_DIR where /dev/shm is small (Docker defaults it to 64 MB). REST uploads, which
+# include large audio and video files, stay in the system temp dir.
+SCRATCH_DIR = os.getenv('SCRATCH_DIR') or ('/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir())
+
+
+def _dotted(fmt: str) -> str:
+    """Normalise a format such as 'png' to the '.png' form used by the registry."""
+    return fmt if fmt.startswith('.') else '.' + fmt
+
+
+def _scratch_path(suffix: str, dir: Optional[str] = SCRATCH_DIR) -> str:
+    """Create an empty scratch file in dir (SCRATCH_DIR by default) and return its path."""
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False, dir=dir) as scratch:
+        return scratch.name
+
+
+async def _run_conversion(module, input_path: str, output_path: str) -> None:
+    """Run a converter module on EXECUTOR."""
+    await asyncio.get_running_loop().run_in_executor(EXECUTOR, module.convert, input_path, output_path)
+
+
+def _remove(path: str) -> None:
+    """Delete a scratch file with a single syscall, ignoring it if it is already gone."""
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(path)
+
+
+# Characters outside the base64 alphabet; b64decode discards these, so the chunker must too before
+# aligning chunks to 4 characters.
+_BASE64_NOISE = re.compile(r'[^A-Za-z0-9+/=]')
+
+
+def _strip_padding(text: str, quad: int, pads: int):
+    """Apply b64decode's padding rules to a chunk of alphabet-only text.
+
+    quad is the number of data characters already seen in the current 4-character group and pads the
+    '=' run carried over from the previous chunk. A '=' only counts once a group holds at least two data
+    characters; otherwise it is skipped. Decoding stops at the first '=' run that completes a group,
+    and everything after it is ignored. Returns (data characters, pads, done); when done the text
+    ends with the padding that closes its final group.
+    """
+    first, *rest = text.split('=')
+    parts = [first]
+    quad = (quad + len(first)) % 4
+    if first:
+        pads = 0
+    for segment in rest:
+        if quad >= 2:
+            pads += 1
+            if quad + pads >= 4:
+                return ''.join(parts) + '=' * (4 - quad), 0, True
+        parts.append(segment)
+        if segment:
+            quad = (quad + len(segment)) % 4
+            pads = 0
+    return ''.join(parts), pads, False
+
+
+def _decode_base64_to_file(data: str, fileobj) -> None:
+    """Decode base64 text into fileobj 4 KB of text at a time, following b64decode's rules."""
+    if not data.isascii():
+        raise ValueError("base64 text must contain only ASCII characters")
+    pending = ""
+    pads = 0
+    for start in range(0, len(data), 4096):
+        text = _BASE64_NOISE.sub("", data[start:start + 4096])
+        done = False
+        if '=' in text:
+            text, pads, done = _strip_padding(text, len(pending), pads)
+        elif text:
+            pads = 0
+        chunk = pending + text
+        usable = len(chunk) - len(chunk) % 4
+        fileobj.write(pybase64.b64decode(chunk[:usable]))
+        pending = chunk[usable:]
+        if done:
+            return
+    if pending:
+        fileobj.write(pybase64.b64decode(pending))
+
+
+def _b64_stream(path: str, block: int = 57 * 1024):
+    """Yield a file's base64 encoding block by block (57 KB is a multiple of 3, so no padding mid-stream)."""
+    with open(path, 'rb') as f:
+        while chunk := f.read(block):
+            yield pybase64.b64encode(chunk)
+
+
+_CONVERTED_PREFIX = b"File converted successfully from %s to %s. Converted file content (base64): "
+
+
+def _converted_message(path: str, input_format: str, output_format: str) -> str:
+    """Build the convert_file reply as one bytes join, decoding to str only at the end."""
+    prefix = _CONVERTED_PREFIX % (input_format.encode('ascii'), output_format.encode('ascii'))
+    return b''.join([prefix, *_b64_stream(path)]).decode('ascii')
 
 # --- Auth Provider ---
 class SimpleBearerAuthProvider(BearerAuthProvider):
@@ -34,15 +161,18 @@ class SimpleBearerAuthProvider(BearerAuthProvider):
         k = RSAKeyPair.generate()
         super().__init__(public_key=k.public_key, jwks_uri=None, issuer=None, audience=None)
         self.token = token
+        self._token_bytes = token.encode()
+        # The accepted token never changes, so every successful check can share one AccessToken
+        self._token_obj = AccessToken(
+            token=token,
+            client_id="puch-client",
+            scopes=["*"],
+            expires_at=None,
+        )
 
     async def load_access_token(self, token: str) -> AccessToken | None:
-        if token == self.token:
-            return AccessToken(
-                token=token,
-                client_id="puch-client",
-                scopes=["*"],
-                expires_at=None,
-            )
+        if hmac.compare_digest(token.encode(), self._token_bytes):
+            return self._token_obj
         return None
 
 # --- MCP Server Setup ---
@@ -68,21 +198,12 @@ async def convert_file(
 ) -> str:
     """Convert files between different formats. Supports documents, images, videos, and audio."""
     try:
-        import base64
-        
         # Ensure formats start with dot
-        if not input_format.startswith('.'):
-            input_format = '.' + input_format
-        if not output_format.startswith('.'):
-            output_format = '.' + output_format
+        input_format = _dotted(input_format)
+        output_format = _dotted(output_format)
         
         # Find appropriate module
-        module = None
-        for mod in registry.modules:
-            formats = mod.SUPPORTED_FORMATS
-            if input_format in formats.get("input", []) and output_format in formats.get("output", []):
-                module = mod
-                break
+        module = registry.dispatch.get((input_format, output_format))
         
         if not module:
             raise McpError(ErrorData(
@@ -90,42 +211,34 @@ async def convert_file(
                 message=f"Conversion from {input_format} to {output_format} not supported"
             ))
         
-        # Decode file content
-        try:
-            file_data = base64.b64decode(file_content)
-        except Exception:
-            raise McpError(ErrorData(
-                code=INVALID_PARAMS,
-                message="Invalid base64 file content"
-            ))
-        
-        # Create temporary files
-        with tempfile.NamedTemporaryFile(suffix=input_format, delete=False) as input_temp:
-            input_temp.write(file_data)
+        # Decode file content straight into the input temp file, off the event loop
+        with tempfile.NamedTemporaryFile(suffix=input_format, delete=False, dir=SCRATCH_DIR) as input_temp:
             input_path = input_temp.name
+            try:
+                await asyncio.get_running_loop().run_in_executor(
+                    EXECUTOR, _decode_base64_to_file, file_content, input_temp
+                )
+            except Exception:
+                input_temp.close()
+                _remove(input_path)
+                raise McpError(ErrorData(
+                    code=INVALID_PARAMS,
+                    message="Invalid base64 file content"
+                ))
         
-        with tempfile.NamedTemporaryFile(suffix=output_format, delete=False) as output_temp:
-            output_path = output_temp.name
+        output_path = _scratch_path(output_format)
         
         try:
-            # Perform conversion
-            module.convert(input_path, output_path)
-            
-            # Read converted file
-            with open(output_path, 'rb') as f:
-                converted_data = f.read()
-            
-            # Encode to base64
-            converted_base64 = base64.b64encode(converted_data).decode('utf-8')
-            
-            return f"File converted successfully from {input_format} to {output_format}. Converted file content (base64): {converted_base64}"
+            # Perform conversion and encode the result off the event loop
+            await _run_conversion(module, input_path, output_path)
+            return await asyncio.get_running_loop().run_in_executor(
+                EXECUTOR, _converted_message, output_path, input_format, output_format
+            )
         
         finally:
             # Cleanup temporary files
-            if os.path.exists(input_path):
-                os.unlink(input_path)
-            if os.path.exists(output_path):
-                os.unlink(output_path)
+            _remove(input_path)
+            _remove(output_path)
     
     except McpError:
         raise
@@ -139,45 +252,31 @@ async def convert_file(
 @mcp.tool
 async def list_supported_formats() -> str:
     """List all supported input and output formats for file conversion."""
-    try:
-        formats_info = {}
-        
-        for module in registry.modules:
-            module_name = module.__name__.split('.')[-1]
-            formats_info[module_name] = module.SUPPORTED_FORMATS
-        
-        # Format nicely for display
-        result = "📋 **Supported File Conversion Formats:**\n\n"
-        
-        for module_name, formats in formats_info.items():
-            result += f"**{module_name.replace('_', ' ').title()}:**\n"
-            result += f"- Input: {', '.join(formats.get('input', []))}\n"
-            result += f"- Output: {', '.join(formats.get('output', []))}\n\n"
-        
-        return result
-    
-    except Exception as e:
-        raise McpError(ErrorData(
-            code=INTERNAL_ERROR,
-            message=f"Failed to list formats: {str(e)}"
-        ))
+    return FORMATS_MARKDOWN
 
 # MCP Protocol Models
+# Unknown keys are ignored and tool arguments are left unvalidated (Any); the tools re-check them
 class ToolCall(BaseModel):
+    model_config = ConfigDict(extra='ignore')
+
     name: str
-    arguments: Dict[str, Any]
+    arguments: Any = Field(default_factory=dict)
 
 class MCPRequest(BaseModel):
+    model_config = ConfigDict(extra='ignore')
+
     jsonrpc: str = "2.0"
     id: str
     method: str
-    params: Dict[str, Any] = {}
+    params: Dict[str, Any] = Field(default_factory=dict)
 
 class MCPResponse(BaseModel):
+    model_config = ConfigDict(extra='ignore')
+
     jsonrpc: str = "2.0"
     id: str
-    result: Dict[str, Any] = {}
-    error: Dict[str, Any] = None
+    result: Dict[str, Any] = Field(default_factory=dict)
+    error: Optional[Dict[str, Any]] = None
 
 # Standard REST API endpoints (legacy compatibility)
 @app.get("/")
@@ -187,11 +286,7 @@ async def root():
 @app.get("/formats")
 async def get_supported_formats():
     """Get all supported input and output formats."""
-    formats = {}
-    for module in registry.modules:
-        module_name = module.__name__.split('.')[-1]
-        formats[module_name] = module.SUPPORTED_FORMATS
-    return formats
+    return Response(content=FORMATS_JSON_BYTES, media_type="application/json")
 
 @app.post("/convert")
 async def convert_file_legacy(
@@ -203,19 +298,13 @@ async def convert_file_legacy(
         raise HTTPException(status_code=400, detail="output_format is required")
     
     # Ensure output format starts with dot
-    if not output_format.startswith('.'):
-        output_format = '.' + output_format
+    output_format = _dotted(output_format)
     
     # Get input format from filename
-    input_format = os.path.splitext(file.filename)[1].lower()
+    input_format = extension(file.filename)
     
     # Find appropriate module
-    module = None
-    for mod in registry.modules:
-        formats = mod.SUPPORTED_FORMATS
-        if input_format in formats.get("input", []) and output_format in formats.get("output", []):
-            module = mod
-            break
+    module = registry.dispatch.get((input_format, output_format))
     
     if not module:
         raise HTTPException(
@@ -223,33 +312,34 @@ async def convert_file_legacy(
             detail=f"Conversion from {input_format} to {output_format} not supported"
         )
     
-    # Create temporary files
+    # Create temporary files; copy the upload in 1 MB chunks on a worker thread
     with tempfile.NamedTemporaryFile(suffix=input_format, delete=False) as input_temp:
-        content = await file.read()
-        input_temp.write(content)
+        await run_in_threadpool(shutil.copyfileobj, file.file, input_temp, 1 << 20)
         input_path = input_temp.name
     
-    output_filename = os.path.splitext(file.filename)[0] + output_format
-    with tempfile.NamedTemporaryFile(suffix=output_format, delete=False) as output_temp:
-        output_path = output_temp.name
+    output_filename = file.filename[:len(file.filename) - len(input_format)] + output_format
+    output_path = _scratch_path(output_format, dir=None)
     
     try:
         # Perform conversion
-        module.convert(input_path, output_path)
+        await _run_conversion(module, input_path, output_path)
         
+        # The output file is removed once the response has been sent
         return FileResponse(
             output_path,
+            stat_result=os.stat(output_path),
             filename=output_filename,
-            media_type='application/octet-stream'
+            media_type='application/octet-stream',
+            background=BackgroundTask(_remove, output_path)
         )
     
     except Exception as e:
+        _remove(output_path)
         raise HTTPException(status_code=500, detail=f"Conversion failed: {str(e)}")
     
     finally:
         # Cleanup input file
-        if os.path.exists(input_path):
-            os.unlink(input_path)
+        _remove(input_path)
 
 # --- Run MCP Server ---
 async def main():
@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+import verify_mcp
+
+
+@pytest.fixture(scope="session")
+def base_url():
+    """URL of the running server under test, taken from MCP_SERVER_URL"""
+    url = os.getenv("MCP_SERVER_URL")
+    if not url:
+        pytest.skip("Set MCP_SERVER_URL to verify a running MCP server")
+    return url.rstrip("/")
+
+
+@pytest.fixture(scope="session")
+def urls(base_url):
+    """Endpoint URLs of the server under test, built once for the whole session"""
+    return verify_mcp.endpoint_urls(base_url)
+
+
+@pytest.fixture(scope="session")
+def mcp_session(base_url):
+    """One keep-alive session shared by every test in the run"""
+    pytest.importorskip("requests")
+    with verify_mcp.make_sync_session() as session:
+        yield session
+
+
+@pytest.fixture(scope="session")
+def initialized(mcp_session, urls):
+    """Perform the JSON-RPC initialize handshake once and share its response"""
+    status, data = verify_mcp.fetch_sync(
+        mcp_session, "POST", urls["/mcp"], data=verify_mcp.INIT_BODY, headers=verify_mcp.JSON_HEADERS
+    )
+    assert status == 200, f"initialize failed: {status}"
+    return data
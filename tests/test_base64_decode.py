@@ -0,0 +1,66 @@
+import base64
+import binascii
+import io
+import random
+
+import pytest
+
+from main import _decode_base64_to_file
+
+
+def decode(text):
+    buffer = io.BytesIO()
+    _decode_base64_to_file(text, buffer)
+    return buffer.getvalue()
+
+
+def assert_matches_b64decode(text):
+    """The chunked decoder must accept, reject and decode exactly like base64.b64decode"""
+    try:
+        expected = base64.b64decode(text)
+    except (binascii.Error, ValueError):
+        with pytest.raises(ValueError):
+            decode(text)
+    else:
+        assert decode(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "QUJD",
+    "QQ==",
+    "QQ",
+    "QQ=",
+    "QUJDRA",
+    "data:image/png;base64,QUJD",
+    "QU\nJD\r\n",
+    "QU-J_D",
+    "QQ==QQ==",
+    "5NjHN9M=pJhL+g==",
+    "=QQ==",
+    "Q=Q==",
+    "QQ=Q",
+    "QUJ=D",
+    "QUJD====",
+    "QUJDé",
+])
+def test_edge_cases(text):
+    assert_matches_b64decode(text)
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_random_payloads(seed):
+    rnd = random.Random(seed)
+    size = rnd.choice([1, 2, 3, 100, 3071, 3072, 3073, 5000, 12000])
+    encoded = base64.b64encode(rnd.randbytes(size)).decode()
+
+    # Line-wrapped, data: URI and urlsafe payloads
+    assert_matches_b64decode("\n".join(encoded[i:i + 76] for i in range(0, len(encoded), 76)))
+    assert_matches_b64decode("data:application/octet-stream;base64," + encoded)
+    assert_matches_b64decode(base64.urlsafe_b64encode(base64.b64decode(encoded)).decode())
+
+    # Stray characters, including '=' in the middle of the payload and text split across 4 KB chunks
+    chars = list(encoded)
+    for _ in range(rnd.randint(1, 8)):
+        chars.insert(rnd.randint(0, len(chars)), rnd.choice("===:-_\n "))
+    assert_matches_b64decode("".join(chars))
@@ -0,0 +1,69 @@
+import json
+import random
+
+import pytest
+
+from verify_mcp import MAX_STRING_BYTES, skim
+
+ALPHABET = 'ab"\\/\n\té☃\U0001f600 '
+
+
+def random_string(rnd, long):
+    length = rnd.randint(MAX_STRING_BYTES + 1, 3 * MAX_STRING_BYTES) if long else rnd.randint(0, 40)
+    return "".join(rnd.choice(ALPHABET) for _ in range(length))
+
+
+def random_value(rnd, depth=0):
+    kind = rnd.random()
+    if depth < 3 and kind < 0.2:
+        return {f"k{i}": random_value(rnd, depth + 1) for i in range(rnd.randint(0, 4))}
+    if depth < 3 and kind < 0.4:
+        return [random_value(rnd, depth + 1) for _ in range(rnd.randint(0, 4))]
+    if kind < 0.55:
+        return rnd.choice([None, True, False, 0, -1.5, 10 ** 20])
+    return random_string(rnd, long=rnd.random() < 0.2)
+
+
+def skimmed(value):
+    """What the skimmer should return: value with every over-long string replaced by ''
+
+    Test strings are either far below MAX_STRING_BYTES once encoded or longer than it in characters alone,
+    so counting characters here gives the same answer as the skimmer's count of encoded bytes.
+    """
+    if isinstance(value, dict):
+        return {key: skimmed(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [skimmed(item) for item in value]
+    if isinstance(value, str) and len(value) > MAX_STRING_BYTES:
+        return ""
+    return value
+
+
+def split(data, rnd):
+    """Cut data into chunks of 1 to 64 bytes"""
+    chunks, pos = [], 0
+    while pos < len(data):
+        step = rnd.randint(1, 64)
+        chunks.append(data[pos:pos + step])
+        pos += step
+    return chunks
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_skim_matches_json_loads(seed):
+    rnd = random.Random(seed)
+    document = {"jsonrpc": "2.0", "id": seed, "result": random_value(rnd)}
+    data = json.dumps(document, ensure_ascii=rnd.random() < 0.5).encode()
+    assert skim(split(data, rnd)) == skimmed(json.loads(data))
+
+
+@pytest.mark.parametrize("data", [
+    b'{"a": "x\\"y", "b": "\\\\", "c": "\\u00e9\\n"}',
+    b'["' + b"x" * MAX_STRING_BYTES + b'", "' + b"x" * (MAX_STRING_BYTES + 1) + b'"]',
+    b'["' + b"\\\\" * (MAX_STRING_BYTES // 4) + b'", "tail\\""]',
+])
+def test_skim_byte_at_a_time(data):
+    """Every split point, including between a backslash and the byte it escapes"""
+    expected = skimmed(json.loads(data))
+    assert skim([data[i:i + 1] for i in range(len(data))]) == expected
+    assert skim([data]) == expected
@@ -0,0 +1,50 @@
+import pytest
+
+import verify_mcp
+
+
+def assert_passed(passed):
+    """Fail with the verifier's log output, clearing it so it cannot leak into the next test"""
+    output = "\n".join(verify_mcp.LOG)
+    verify_mcp.LOG.clear()
+    assert passed, output
+
+
+def run_probe(session, urls, spec):
+    """Run a verifier probe and fail with its log output"""
+    assert_passed(verify_mcp.probe_sync(session, urls, spec))
+
+
+def test_health(mcp_session, urls):
+    run_probe(mcp_session, urls, verify_mcp.HEALTH_PROBE)
+
+
+def test_token_validation(mcp_session, urls):
+    run_probe(mcp_session, urls, verify_mcp.TOKEN_PROBE)
+
+
+def test_initialize(initialized):
+    assert_passed(verify_mcp.check_initialize(initialized))
+
+
+def test_tools_list(mcp_session, urls, initialized):
+    probe = verify_mcp.rpc_probe("Tools List", verify_mcp.TOOLS_LIST_BODY, verify_mcp.check_tools_list)
+    run_probe(mcp_session, urls, probe)
+
+
+def test_list_formats(mcp_session, urls, initialized):
+    probe = verify_mcp.rpc_probe("List Formats Tool", verify_mcp.LIST_FORMATS_BODY, verify_mcp.check_list_formats)
+    run_probe(mcp_session, urls, probe)
+
+
+@pytest.mark.parametrize(
+    "label, body, check",
+    [(label, body, check) for label, _, body, check in verify_mcp.CONVERSION_PROBES],
+    ids=[f"{case[0]}-{case[1]}" for case in verify_mcp.CONVERSION_CASES],
+)
+def test_file_conversion(mcp_session, urls, initialized, label, body, check):
+    run_probe(mcp_session, urls, verify_mcp.rpc_probe(label, body, check))
+
+
+def test_file_upload(mcp_session, urls):
+    run_probe(mcp_session, urls, verify_mcp.UPLOAD_PROBE)
@@ -0,0 +1,29 @@
+import itertools
+import posixpath
+
+import pytest
+
+from converter.registry import extension
+
+
+@pytest.mark.parametrize("filename", [
+    "report.PDF",
+    "archive.tar.gz",
+    ".bashrc",
+    "..hidden",
+    "..hidden.txt",
+    "dir.d/file",
+    "dir/.profile",
+    "dir/file.",
+    "",
+])
+def test_extension_examples(filename):
+    assert extension(filename) == posixpath.splitext(filename)[1].lower()
+
+
+def test_extension_matches_splitext():
+    """Every name of up to 6 characters built from letters, dots and slashes agrees with posixpath.splitext"""
+    for length in range(7):
+        for chars in itertools.product("a./P", repeat=length):
+            filename = "".join(chars)
+            assert extension(filename) == posixpath.splitext(filename)[1].lower(), filename
@@ -2,184 +2,758 @@
 """
 MCP Server Verification Script
 Tests all MCP endpoints and validates compatibility with Puch AI requirements
+
+Probes run concurrently on asyncio + aiohttp. Pass --http2 to multiplex them over one
+HTTP/2 connection with httpx, or --sync (or run without aiohttp installed) to use
+requests with a thread pool instead. --concurrency N adds a stress run of N parallel
+conversions and reports throughput and latency.
 """
-import requests
-import json
+import argparse
+import asyncio
 import base64
+import re
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-def test_mcp_server(base_url="http://localhost:8000"):
-    """Test all MCP endpoints"""
-    
-    print(f"Testing MCP Server at: {base_url}")
-    print("=" * 50)
-    
-    # Test 1: Basic server health
+try:
+    import orjson
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+except ImportError:
+    import json
+
+    def json_dumps(obj):
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    json_loads = json.loads
+
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+
+# Every request is bounded so a hung server cannot block the verifier forever
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10
+KEEP_ALIVE_HEADERS = {"Connection": "keep-alive"}
+
+# Output is collected here and written with a single write() once the run finishes
+LOG = []
+
+
+def log(message):
+    LOG.append(message)
+
+
+def flush_log():
+    if LOG:
+        sys.stdout.write("\n".join(LOG) + "\n")
+        sys.stdout.flush()
+        LOG.clear()
+
+
+# Set by --verbose; per-tool details are only listed when it is on
+VERBOSE = False
+
+# --- Response schemas, compiled once into specialised validators when fastjsonschema is installed ---
+INIT_RESPONSE_SCHEMA = {
+    "type": "object",
+    "required": ["result"],
+    "properties": {
+        "result": {
+            "type": "object",
+            "required": ["serverInfo"],
+            "properties": {
+                "serverInfo": {
+                    "type": "object",
+                    "required": ["name"],
+                    "properties": {"name": {"type": "string"}}
+                }
+            }
+        }
+    }
+}
+TOOLS_LIST_RESPONSE_SCHEMA = {
+    "type": "object",
+    "required": ["result"],
+    "properties": {
+        "result": {
+            "type": "object",
+            "required": ["tools"],
+            "properties": {
+                "tools": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "required": ["name", "description"],
+                        "properties": {"name": {"type": "string"}, "description": {"type": "string"}}
+                    }
+                }
+            }
+        }
+    }
+}
+if fastjsonschema is not None:
+    SCHEMA_ERRORS = (fastjsonschema.JsonSchemaException,)
+    validate_initialize = fastjsonschema.compile(INIT_RESPONSE_SCHEMA)
+    validate_tools_list = fastjsonschema.compile(TOOLS_LIST_RESPONSE_SCHEMA)
+else:
+    # Plain key lookups covering the same required fields; a missing key or wrong container raises
+    SCHEMA_ERRORS = (KeyError, TypeError)
+
+    def validate_initialize(data):
+        if not isinstance(data["result"]["serverInfo"]["name"], str):
+            raise TypeError("data.result.serverInfo.name must be string")
+
+    def validate_tools_list(data):
+        for tool in data["result"]["tools"]:
+            if not isinstance(tool["name"], str) or not isinstance(tool["description"], str):
+                raise TypeError("tool name and description must be strings")
+
+
+# --- Response checks (shared by the async and sync runners) ---
+def check_health(data):
+    """Test 1: Basic server health"""
+    log(f"✓ Server Health: {data}")
+    return True
+
+
+def check_token(data):
+    """Test 2: Token validation (required by Puch AI)"""
+    if "phone" in data:
+        log(f"✓ Token Validation: {data['phone']}")
+        return True
+    log("✗ Token Validation: Missing phone number")
+    return False
+
+
+def check_initialize(data):
+    """Test 3: MCP Initialize"""
     try:
-        response = requests.get(f"{base_url}/")
-        print(f"✓ Server Health: {response.json()}")
-    except Exception as e:
-        print(f"✗ Server Health Failed: {e}")
+        validate_initialize(data)
+    except SCHEMA_ERRORS:
+        log("✗ MCP Initialize: Invalid response")
         return False
-    
-    # Test 2: Token validation (required by Puch AI)
+    if data["result"]["serverInfo"]["name"] == "file-converter":
+        log("✓ MCP Initialize: Success")
+        return True
+    log("✗ MCP Initialize: Invalid response")
+    return False
+
+
+def check_tools_list(data):
+    """Test 4: Tools List"""
     try:
-        response = requests.post(
-            f"{base_url}/mcp/validate",
-            headers={"Authorization": "Bearer test_token_123"}
-        )
-        if response.status_code == 200:
-            data = response.json()
-            if "phone" in data:
-                print(f"✓ Token Validation: {data['phone']}")
-            else:
-                print("✗ Token Validation: Missing phone number")
-                return False
-        else:
-            print(f"✗ Token Validation Failed: {response.status_code}")
-            return False
-    except Exception as e:
-        print(f"✗ Token Validation Error: {e}")
+        validate_tools_list(data)
+    except SCHEMA_ERRORS as e:
+        log(f"✗ Tools List: Invalid response ({e})")
         return False
-    
-    # Test 3: MCP Initialize
-    try:
-        response = requests.post(
-            f"{base_url}/mcp",
-            json={
-                "jsonrpc": "2.0",
-                "id": "1",
-                "method": "initialize",
-                "params": {}
+    tools = data["result"]["tools"]
+    if len(tools) >= 2:  # Should have convert_file and list_supported_formats
+        log(f"✓ Tools List: {len(tools)} tools available")
+        if VERBOSE:
+            for tool in tools:
+                log(f"  - {tool['name']}: {tool['description'][:80]}...")
+        return True
+    log("✗ Tools List: Insufficient tools")
+    return False
+
+
+def check_list_formats(data):
+    """Test 5: List Formats Tool"""
+    if "result" in data:
+        log("✓ List Formats Tool: Success")
+        return True
+    log("✗ List Formats Tool: No result")
+    return False
+
+
+def conversion_check(label):
+    """Build the check for one convert_file case, reporting under that case's label"""
+    def check_conversion(data):
+        if "result" in data:
+            log(f"✓ {label}: Success")
+            return True
+        log(f"✗ {label}: No result")
+        return False
+    return check_conversion
+
+
+def check_upload(data):
+    """File conversion through the multipart /convert endpoint"""
+    if data:
+        log(f"✓ File Upload Test (.png → .jpg): {data} bytes returned")
+        return True
+    log("✗ File Upload Test (.png → .jpg): Empty file returned")
+    return False
+
+
+def judge(label, check, status, data):
+    """Apply a check to a response, reporting non-200 statuses under the probe's label"""
+    if status != 200:
+        log(f"✗ {label} Failed: {status}")
+        return False
+    return check(data)
+
+
+def judge_batch(data, probes):
+    """Check a JSON-RPC batch response; returns None when the server did not answer with a batch"""
+    if not isinstance(data, list):
+        return None
+    responses = {item.get("id"): item for item in data if isinstance(item, dict)}
+    results = []
+    for label, request, _, check in probes:
+        if request["id"] in responses:
+            results.append(check(responses[request["id"]]))
+        else:
+            log(f"✗ {label}: No response in batch")
+            results.append(False)
+    return all(results)
+
+
+# --- Probe definitions ---
+HEALTH_PROBE = ("Server Health", "GET", "/", {}, check_health)
+TOKEN_PROBE = ("Token Validation", "POST", "/mcp/validate",
+               {"headers": {"Authorization": "Bearer test_token_123"}}, check_token)
+
+# Static JSON-RPC requests, serialized once at import instead of on every probe
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+INIT_REQUEST = {
+    "jsonrpc": "2.0",
+    "id": "1",
+    "method": "initialize",
+    "params": {}
+}
+TOOLS_LIST_REQUEST = {
+    "jsonrpc": "2.0",
+    "id": "2",
+    "method": "tools/list",
+    "params": {}
+}
+LIST_FORMATS_REQUEST = {
+    "jsonrpc": "2.0",
+    "id": "3",
+    "method": "tools/call",
+    "params": {
+        "name": "list_supported_formats",
+        "arguments": {}
+    }
+}
+
+INIT_BODY = json_dumps(INIT_REQUEST)
+TOOLS_LIST_BODY = json_dumps(TOOLS_LIST_REQUEST)
+LIST_FORMATS_BODY = json_dumps(LIST_FORMATS_REQUEST)
+
+# JSON-RPC probes against /mcp: (label, request, serialized request, check for the matching response)
+RPC_PROBES = [
+    ("MCP Initialize", INIT_REQUEST, INIT_BODY, check_initialize),
+    ("Tools List", TOOLS_LIST_REQUEST, TOOLS_LIST_BODY, check_tools_list),
+    ("List Formats Tool", LIST_FORMATS_REQUEST, LIST_FORMATS_BODY, check_list_formats),
+]
+RPC_BATCH_BODY = json_dumps([request for _, request, _, _ in RPC_PROBES])
+
+# Every path the probes hit; endpoint_urls joins them to the base URL once per run instead of per request
+ENDPOINT_PATHS = ("/", "/mcp", "/mcp/validate", "/convert")
+
+
+def endpoint_urls(base_url):
+    """Map each probed path to its full URL"""
+    base_url = base_url.rstrip("/")
+    return {path: f"{base_url}{path}" for path in ENDPOINT_PATHS}
+
+
+def rpc_probe(label, body, check):
+    """Build a probe spec that POSTs a serialized JSON-RPC body to /mcp"""
+    return (label, "POST", "/mcp", {"data": body, "headers": JSON_HEADERS}, check)
+
+
+# A simple test image (1x1 grayscale PNG); the MCP tool takes it base64-encoded, encoded once here
+TEST_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d49484452000000010000000108000000003a7e9b55"
+    "0000000a4944415478da6360000000020001e527defc0000000049454e44ae426082"
+)
+TEST_PNG_B64 = base64.b64encode(TEST_PNG).decode()
+
+# Format pairs exercised by the conversion probes: (input format, output format, base64 content)
+CONVERSION_CASES = [
+    (".png", ".jpg", TEST_PNG_B64),
+    (".png", ".webp", TEST_PNG_B64),
+    (".png", ".bmp", TEST_PNG_B64),
+]
+
+
+def conversion_probe(request_id, input_format, output_format, content):
+    """Build a (label, request, serialized request, check) entry for one conversion case"""
+    label = f"File Conversion Test ({input_format} → {output_format})"
+    request = {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "method": "tools/call",
+        "params": {
+            "name": "convert_file",
+            "arguments": {
+                "input_format": input_format,
+                "output_format": output_format,
+                "file_content": content
             }
-        )
-        if response.status_code == 200:
-            data = response.json()
-            if data.get("result", {}).get("serverInfo", {}).get("name") == "file-converter":
-                print("✓ MCP Initialize: Success")
+        }
+    }
+    return (label, request, json_dumps(request), conversion_check(label))
+
+
+# /convert takes the raw PNG as a multipart upload, skipping base64 altogether.
+# Upload probes report the size of the converted file instead of a JSON body.
+UPLOAD_PROBE = ("File Upload Test (.png → .jpg)", "POST", "/convert", {
+    "files": {"file": ("test.png", TEST_PNG, "image/png")},
+    "data": {"output_format": ".jpg"}
+}, check_upload)
+
+# Each case gets its own id so the batched responses can be matched back to it
+CONVERSION_PROBES = [
+    conversion_probe(f"convert-{index}", *case) for index, case in enumerate(CONVERSION_CASES, start=1)
+]
+CONVERSION_BATCH_BODY = json_dumps([request for _, request, _, _ in CONVERSION_PROBES])
+
+# --- Streamed conversion responses ---
+# convert_file answers carry the whole converted file as base64 text, which the checks never look at.
+# Those responses are streamed through JSONSkimmer, which copies the JSON structure but empties every
+# string longer than MAX_STRING_BYTES, so memory stays flat however large the converted file is.
+SKIMMED_BODIES = {CONVERSION_BATCH_BODY} | {body for _, _, body, _ in CONVERSION_PROBES}
+CHUNK_SIZE = 64 * 1024
+MAX_STRING_BYTES = 1024
+STRING_SPECIAL = re.compile(rb'["\\]')
+
+
+class JSONSkimmer:
+    """Incrementally copy a JSON document, replacing long string values with empty strings"""
+
+    def __init__(self):
+        self.parts = []
+        self.string = None  # pieces of the string being read; None outside strings or once it is too long
+        self.in_string = False
+        self.escaped = False  # the previous chunk ended on a backslash
+        self.length = 0
+
+    def keep(self, piece):
+        if self.string is not None:
+            self.length += len(piece)
+            if self.length > MAX_STRING_BYTES:
+                self.string = None
             else:
-                print("✗ MCP Initialize: Invalid response")
-                return False
-        else:
-            print(f"✗ MCP Initialize Failed: {response.status_code}")
-            return False
+                self.string.append(piece)
+
+    def feed(self, chunk):
+        pos, end = 0, len(chunk)
+        while pos < end:
+            if not self.in_string:
+                quote = chunk.find(b'"', pos)
+                stop = end if quote < 0 else quote + 1
+                self.parts.append(chunk[pos:stop])
+                if quote >= 0:
+                    self.in_string, self.string, self.length = True, [], 0
+                pos = stop
+                continue
+            # A byte that follows a backslash is escaped and can never end the string
+            match = STRING_SPECIAL.search(chunk, pos + 1 if self.escaped else pos)
+            self.escaped = False
+            if match is None:
+                self.keep(chunk[pos:])
+                pos = end
+            elif match.group() == b"\\":
+                self.keep(chunk[pos:match.end()])
+                self.escaped = True
+                pos = match.end()
+            else:
+                self.keep(chunk[pos:match.start()])
+                self.parts.append(b"".join(self.string or ()) + b'"')
+                self.in_string = False
+                pos = match.end()
+
+    def result(self):
+        return json_loads(b"".join(self.parts))
+
+
+def skim(chunks):
+    skimmer = JSONSkimmer()
+    for chunk in chunks:
+        skimmer.feed(chunk)
+    return skimmer.result()
+
+
+async def skim_async(chunks):
+    skimmer = JSONSkimmer()
+    async for chunk in chunks:
+        skimmer.feed(chunk)
+    return skimmer.result()
+
+# --- Stress run (--concurrency) ---
+# At most this many conversions are in flight at once, whatever N is
+MAX_IN_FLIGHT = 32
+
+
+def stress_request():
+    """The (url path, serialized body) of the conversion each stress call sends"""
+    _, _, body, _ = CONVERSION_PROBES[0]
+    return "/mcp", body
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+def report_stress(n, passed, elapsed, latencies):
+    log(f"\nStress Test: {passed}/{n} conversions succeeded in {elapsed:.2f}s ({n / elapsed:.1f} req/s)")
+    if latencies:
+        latencies.sort()
+        log(f"  Latency p50: {percentile(latencies, 50) * 1000:.1f} ms, p95: {percentile(latencies, 95) * 1000:.1f} ms")
+    return passed == n
+
+
+def print_header(base_url):
+    log(f"Testing MCP Server at: {base_url}")
+    log("=" * 50)
+
+
+def print_success():
+    log("\n" + "=" * 50)
+    log("✓ All MCP tests passed!")
+    log("\nYour server is ready for Puch AI integration!")
+    log("\nNext steps:")
+    log("1. Deploy to a public HTTPS endpoint")
+    log("2. Use this command in Puch AI:")
+    log("   /mcp connect https://your-server.com/mcp your_bearer_token")
+
+
+# --- Async runner (aiohttp) ---
+def make_session(http2=False, connections=8):
+    """Create a client whose keep-alive pool is shared by every probe (httpx when HTTP/2 is requested)"""
+    if http2:
+        return httpx.AsyncClient(
+            http2=True,
+            headers=KEEP_ALIVE_HEADERS,
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+        )
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=connections, keepalive_timeout=30),
+        headers=KEEP_ALIVE_HEADERS,
+        timeout=aiohttp.ClientTimeout(sock_connect=CONNECT_TIMEOUT, sock_read=READ_TIMEOUT),
+    )
+
+
+async def fetch(session, method, url, **kwargs):
+    """Send a request and return (status, JSON body or None), skimming conversion responses as they stream in"""
+    if "files" in kwargs:
+        return await send_upload(session, method, url, kwargs["files"], kwargs["data"])
+    skimmed = kwargs.get("data") in SKIMMED_BODIES
+    if httpx is not None and isinstance(session, httpx.AsyncClient):
+        if "data" in kwargs:
+            kwargs["content"] = kwargs.pop("data")  # httpx takes raw bytes as content=
+        async with session.stream(method, url, **kwargs) as response:
+            if response.status_code != 200:
+                return response.status_code, None
+            if skimmed:
+                return 200, await skim_async(response.aiter_bytes(CHUNK_SIZE))
+            return 200, json_loads(await response.aread())
+    async with session.request(method, url, **kwargs) as response:
+        if response.status != 200:
+            return response.status, None
+        if skimmed:
+            return 200, await skim_async(response.content.iter_chunked(CHUNK_SIZE))
+        return 200, json_loads(await response.read())
+
+
+async def send_upload(session, method, url, files, fields):
+    """POST a multipart upload and return (status, size of the returned file), discarding its bytes"""
+    if httpx is not None and isinstance(session, httpx.AsyncClient):
+        async with session.stream(method, url, files=files, data=fields) as response:
+            if response.status_code != 200:
+                return response.status_code, None
+            return 200, sum([len(chunk) async for chunk in response.aiter_bytes(CHUNK_SIZE)])
+    form = aiohttp.FormData(fields)
+    for name, (filename, content, content_type) in files.items():
+        form.add_field(name, content, filename=filename, content_type=content_type)
+    async with session.request(method, url, data=form) as response:
+        if response.status != 200:
+            return response.status, None
+        return 200, sum([len(chunk) async for chunk in response.content.iter_chunked(CHUNK_SIZE)])
+
+
+async def probe(session, urls, spec):
+    """Run one probe spec and check its response"""
+    label, method, path, kwargs, check = spec
+    try:
+        status, data = await fetch(session, method, urls[path], **kwargs)
     except Exception as e:
-        print(f"✗ MCP Initialize Error: {e}")
+        log(f"✗ {label} Error: {str(e) or type(e).__name__}")  # timeouts carry no message
         return False
-    
-    # Test 4: Tools List
+    return judge(label, check, status, data)
+
+
+class ProbeFailed(Exception):
+    """Raised when a probe fails so run_fail_fast can stop waiting on the others"""
+
+
+async def require(coro):
+    if not await coro:
+        raise ProbeFailed
+
+
+async def run_fail_fast(*coros):
+    """Run probes concurrently, cancelling those still in flight as soon as one fails"""
+    tasks = [asyncio.create_task(require(coro)) for coro in coros]
+    done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    passed = not pending
+    for task in done:
+        error = task.exception()
+        if error is not None:
+            if not isinstance(error, ProbeFailed):
+                raise error
+            passed = False
+    return passed
+
+
+async def probe_rpc_batch(session, urls, probes, batch_body):
+    """Send a set of JSON-RPC probes in one batch request and check each response by id"""
     try:
-        response = requests.post(
-            f"{base_url}/mcp",
-            json={
-                "jsonrpc": "2.0",
-                "id": "2",
-                "method": "tools/list",
-                "params": {}
-            }
-        )
-        if response.status_code == 200:
-            data = response.json()
-            tools = data.get("result", {}).get("tools", [])
-            if len(tools) >= 2:  # Should have convert_file and list_supported_formats
-                print(f"✓ Tools List: {len(tools)} tools available")
-                for tool in tools:
-                    print(f"  - {tool['name']}: {tool['description'][:80]}...")
-            else:
-                print("✗ Tools List: Insufficient tools")
+        _, data = await fetch(session, "POST", urls["/mcp"], data=batch_body, headers=JSON_HEADERS)
+    except Exception:
+        data = None
+    result = judge_batch(data, probes)
+    if result is None:
+        # The server does not answer JSON-RPC batches; fall back to one request per probe
+        result = await run_fail_fast(*(
+            probe(session, urls, rpc_probe(label, body, check))
+            for label, _, body, check in probes
+        ))
+    return result
+
+
+async def test_mcp_server(session, base_url="http://localhost:8000"):
+    """Test all MCP endpoints"""
+    print_header(base_url)
+    urls = endpoint_urls(base_url)
+
+    # The health check gates everything else; the remaining probes are independent and run concurrently
+    if not await probe(session, urls, HEALTH_PROBE):
+        return False
+
+    if not await run_fail_fast(
+        probe(session, urls, TOKEN_PROBE),
+        probe_rpc_batch(session, urls, RPC_PROBES, RPC_BATCH_BODY),  # Tests 3-5
+    ):
+        return False
+
+    print_success()
+    return True
+
+
+async def test_file_conversion(session, base_url="http://localhost:8000"):
+    """Test file conversion capability"""
+    log("\nTesting File Conversion...")
+    urls = endpoint_urls(base_url)
+    return await run_fail_fast(
+        probe_rpc_batch(session, urls, CONVERSION_PROBES, CONVERSION_BATCH_BODY),
+        probe(session, urls, UPLOAD_PROBE),
+    )
+
+
+async def stress(session, base_url, n):
+    """Send n conversions concurrently through one session and report throughput and p50/p95 latency"""
+    path, body = stress_request()
+    url = endpoint_urls(base_url)[path]
+    semaphore = asyncio.Semaphore(min(n, MAX_IN_FLIGHT))
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                status, data = await fetch(session, "POST", url, data=body, headers=JSON_HEADERS)
+            except Exception:
                 return False
-        else:
-            print(f"✗ Tools List Failed: {response.status_code}")
-            return False
+            latencies.append(time.perf_counter() - started)
+            return status == 200 and "result" in data
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(one() for _ in range(n)))
+    return report_stress(n, sum(results), time.perf_counter() - started, latencies)
+
+
+async def main(base_url, http2=False, concurrency=1):
+    async with make_session(http2, connections=max(8, min(concurrency, MAX_IN_FLIGHT))) as session:
+        success = await test_mcp_server(session, base_url)
+        if success:
+            converted = await test_file_conversion(session, base_url)
+            stressed = concurrency <= 1 or await stress(session, base_url, concurrency)
+            return 0 if converted and stressed else 1
+        log("\n✗ MCP server tests failed!")
+        return 1
+
+
+# --- Sync runner (requests + thread pool) ---
+def make_sync_session(pool_size=4):
+    """Create a requests session; its connection pool is thread-safe and shared by the worker threads"""
+    session = requests.Session()
+    session.headers.update(KEEP_ALIVE_HEADERS)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch_sync(session, method, url, **kwargs):
+    """Send a request and return (status, JSON body or None), skimming conversion responses as they stream in"""
+    if "files" in kwargs:
+        # Multipart upload: drain the converted file and report its size
+        with session.request(method, url, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), stream=True, **kwargs) as response:
+            if response.status_code != 200:
+                return response.status_code, None
+            return 200, sum(len(chunk) for chunk in response.iter_content(CHUNK_SIZE))
+    skimmed = kwargs.get("data") in SKIMMED_BODIES
+    with session.request(method, url, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), stream=skimmed, **kwargs) as response:
+        if response.status_code != 200:
+            return response.status_code, None
+        return 200, skim(response.iter_content(CHUNK_SIZE)) if skimmed else json_loads(response.content)
+
+
+def probe_sync(session, urls, spec):
+    """Run one probe spec and check its response"""
+    label, method, path, kwargs, check = spec
+    try:
+        status, data = fetch_sync(session, method, urls[path], **kwargs)
     except Exception as e:
-        print(f"✗ Tools List Error: {e}")
+        log(f"✗ {label} Error: {str(e) or type(e).__name__}")  # timeouts carry no message
         return False
-    
-    # Test 5: List Formats Tool
+    return judge(label, check, status, data)
+
+
+def probe_rpc_batch_sync(session, urls, executor, probes, batch_body):
+    """Send a set of JSON-RPC probes in one batch request and check each response by id"""
     try:
-        response = requests.post(
-            f"{base_url}/mcp",
-            json={
-                "jsonrpc": "2.0",
-                "id": "3",
-                "method": "tools/call",
-                "params": {
-                    "name": "list_supported_formats",
-                    "arguments": {}
-                }
-            }
-        )
-        if response.status_code == 200:
-            data = response.json()
-            if "result" in data:
-                print("✓ List Formats Tool: Success")
-            else:
-                print("✗ List Formats Tool: No result")
-                return False
-        else:
-            print(f"✗ List Formats Tool Failed: {response.status_code}")
-            return False
-    except Exception as e:
-        print(f"✗ List Formats Tool Error: {e}")
+        _, data = fetch_sync(session, "POST", urls["/mcp"], data=batch_body, headers=JSON_HEADERS)
+    except Exception:
+        data = None
+    result = judge_batch(data, probes)
+    if result is None:
+        # The server does not answer JSON-RPC batches; fall back to one request per probe
+        futures = [
+            executor.submit(probe_sync, session, urls, rpc_probe(label, body, check))
+            for label, _, body, check in probes
+        ]
+        result = all([future.result() for future in futures])
+    return result
+
+
+def test_mcp_server_sync(session, base_url="http://localhost:8000"):
+    """Test all MCP endpoints, running the independent probes on a thread pool"""
+    print_header(base_url)
+    urls = endpoint_urls(base_url)
+
+    if not probe_sync(session, urls, HEALTH_PROBE):
         return False
-    
-    print("\n" + "=" * 50)
-    print("✓ All MCP tests passed!")
-    print("\nYour server is ready for Puch AI integration!")
-    print("\nNext steps:")
-    print("1. Deploy to a public HTTPS endpoint")
-    print("2. Use this command in Puch AI:")
-    print("   /mcp connect https://your-server.com/mcp your_bearer_token")
-    
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        futures = [
+            executor.submit(probe_sync, session, urls, TOKEN_PROBE),
+            executor.submit(probe_rpc_batch_sync, session, urls, executor, RPC_PROBES, RPC_BATCH_BODY),
+        ]
+        if not all([future.result() for future in futures]):
+            return False
+
+    print_success()
     return True
 
-def test_file_conversion(base_url="http://localhost:8000"):
+
+def test_file_conversion_sync(session, base_url="http://localhost:8000"):
     """Test file conversion capability"""
-    print("\nTesting File Conversion...")
-    
-    # Create a simple test image (1x1 PNG)
-    test_png = base64.b64encode(
-        b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x01\x00\x00\x00\x007n\xf9$\x00\x00\x00\nIDAT\x08\x1dc\xf8\x00\x00\x00\x01\x00\x01u\xcc\xb4\x1c\x00\x00\x00\x00IEND\xaeB`\x82'
-    ).decode('utf-8')
-    
-    try:
-        response = requests.post(
-            f"{base_url}/mcp",
-            json={
-                "jsonrpc": "2.0",
-                "id": "4",
-                "method": "tools/call",
-                "params": {
-                    "name": "convert_file",
-                    "arguments": {
-                        "input_format": ".png",
-                        "output_format": ".jpg",
-                        "file_content": test_png
-                    }
-                }
-            }
-        )
-        if response.status_code == 200:
-            data = response.json()
-            if "result" in data:
-                print("✓ File Conversion Test: Success")
-                return True
-            else:
-                print("✗ File Conversion Test: No result")
-                return False
-        else:
-            print(f"✗ File Conversion Test Failed: {response.status_code}")
+    log("\nTesting File Conversion...")
+    urls = endpoint_urls(base_url)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [
+            executor.submit(probe_rpc_batch_sync, session, urls, executor, CONVERSION_PROBES, CONVERSION_BATCH_BODY),
+            executor.submit(probe_sync, session, urls, UPLOAD_PROBE),
+        ]
+        return all([future.result() for future in futures])
+
+
+def stress_sync(session, base_url, n):
+    """Send n conversions on a thread pool through one session and report throughput and p50/p95 latency"""
+    path, body = stress_request()
+    url = endpoint_urls(base_url)[path]
+    latencies = []
+
+    def one():
+        started = time.perf_counter()
+        try:
+            status, data = fetch_sync(session, "POST", url, data=body, headers=JSON_HEADERS)
+        except Exception:
             return False
-    except Exception as e:
-        print(f"✗ File Conversion Test Error: {e}")
-        return False
+        latencies.append(time.perf_counter() - started)
+        return status == 200 and "result" in data
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(n, MAX_IN_FLIGHT)) as executor:
+        results = [future.result() for future in [executor.submit(one) for _ in range(n)]]
+    return report_stress(n, sum(results), time.perf_counter() - started, latencies)
+
+
+def main_sync(base_url, concurrency=1):
+    with make_sync_session(pool_size=max(4, min(concurrency, MAX_IN_FLIGHT))) as session:
+        success = test_mcp_server_sync(session, base_url)
+        if success:
+            converted = test_file_conversion_sync(session, base_url)
+            stressed = concurrency <= 1 or stress_sync(session, base_url, concurrency)
+            return 0 if converted and stressed else 1
+        log("\n✗ MCP server tests failed!")
+        return 1
+
 
 if __name__ == "__main__":
-    base_url = sys.argv[1] if len(sys.argv) > 1 else "http://localhost:8000"
-    
-    success = test_mcp_server(base_url)
-    if success:
-        test_file_conversion(base_url)
-    else:
-        print("\n✗ MCP server tests failed!")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Verify a File Converter MCP server")
+    parser.add_argument("base_url", nargs="?", default="http://localhost:8000")
+    parser.add_argument("--sync", action="store_true", help="use requests and a thread pool instead of aiohttp")
+    parser.add_argument("--http2", action="store_true", help="multiplex the probes over HTTP/2 with httpx")
+    parser.add_argument("-v", "--verbose", action="store_true", help="list every tool the server exposes")
+    parser.add_argument("--concurrency", type=int, default=1, metavar="N",
+                        help="after the checks, send N conversions in parallel and report throughput and latency")
+    args = parser.parse_args()
+    VERBOSE = args.verbose
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+
+    if args.http2 and httpx is None:
+        sys.exit("✗ --http2 requires httpx: pip install 'httpx[http2]'")
+    use_sync = args.sync or (aiohttp is None and not args.http2)
+    if use_sync and requests is None:
+        sys.exit("✗ Install aiohttp (or requests for --sync) to run the verifier")
+
+    try:
+        if use_sync:
+            exit_code = main_sync(args.base_url, concurrency=args.concurrency)
+        else:
+            exit_code = asyncio.run(main(args.base_url, http2=args.http2, concurrency=args.concurrency))
+    finally:
+        flush_log()
+    sys.exit(exit_code)